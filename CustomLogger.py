@@ -1,5 +1,27 @@
 import logging
-import inspect 
+import pprint
+import sys
+
+def _stack_depth(frame) -> int:
+    # walking f_back is much cheaper than inspect.stack(), which builds a FrameInfo
+    # (including source context) for every frame on the stack
+    depth = 0
+    while frame:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+class LazyFormat:
+    """
+    Wraps an object so that it is only pretty printed when a log record is actually emitted.
+    Usage: logger.debug("config: %s", LazyFormat(config))
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return pprint.pformat(self.obj)
 
 class IndentFormatter(logging.Formatter):
     """
@@ -13,33 +35,14 @@ class IndentFormatter(logging.Formatter):
         format(rec):
             Formats the specified record as text, adding indentation and function name.
     """
-    grey = "\x1b[38;20m"
-    yellow = "\x1b[33;20m"
-    red = "\x1b[31;20m"
-    bold_red = "\x1b[31;1m"
-    reset = "\x1b[0m"
-    format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s (%(filename)s:%(lineno)d)"
-
-    FORMATS = {
-        logging.DEBUG: grey + format + reset,
-        logging.INFO: grey + format + reset,
-        logging.WARNING: yellow + format + reset,
-        logging.ERROR: red + format + reset,
-        logging.CRITICAL: bold_red + format + reset
-    }
-
-
     def __init__( self, fmt=None, datefmt=None ):
         logging.Formatter.__init__(self, fmt, datefmt)
-        self.baseline = len(inspect.stack())
+        self.baseline = _stack_depth(sys._getframe())
 
     def format( self, rec ):
-        log_fmt = self.FORMATS.get(rec.levelno)
-        formatter = logging.Formatter(log_fmt)
-
-        stack = inspect.stack()
-        rec.indent = '    '*(len(stack)-self.baseline-3)
-        rec.function = stack[8][3]
+        frame = sys._getframe()
+        rec.indent = '    '*(_stack_depth(frame)-self.baseline-3)
+        rec.function = rec.funcName
         out = logging.Formatter.format(self, rec)
         del rec.indent; del rec.function
         return out
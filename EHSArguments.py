@@ -1,10 +1,11 @@
 import argparse
 import os
 from EHSExceptions import ArgumentException
+from EHSSingleton import Singleton
 
 from CustomLogger import logger, setDebugMode
 
-class EHSArguments:
+class EHSArguments(metaclass=Singleton):
     """
     EHSArguments is a singleton class that handles command-line arguments for the EHS Sentinel script.
     Attributes:
@@ -13,7 +14,6 @@ class EHSArguments:
         DUMPFILE (str): Path to the dump file.
         _instance (EHSArguments): Singleton instance of the class.
     Methods:
-        __new__(cls, *args, **kwargs): Ensures only one instance of the class is created.
         __init__(self): Initializes the class, parses command-line arguments, and sets attributes.
     """
 
@@ -23,18 +23,9 @@ class EHSArguments:
 
     _instance = None
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(EHSArguments, cls).__new__(cls, *args, **kwargs)
-            cls._instance._initialized = False
-        return cls._instance
-
     def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
         logger.debug("init EHSArguments")
-        parser = argparse.ArgumentParser(description="Process some integers.")
+        parser = argparse.ArgumentParser(description="Process some integers.", allow_abbrev=False)
         parser.add_argument('--configfile', type=str, required=True, help='Config file path')
         parser.add_argument('--dumpfile', type=str,  required=False, help='File Path for where the Dumpfile should be written to or read from if dryrun flag is set too.')
         parser.add_argument('--dryrun', action='store_true', default=False, required=False, help='Run the script in dry run mode, data will be read from DumpFile and not MQTT Message will be sent.')
@@ -46,7 +37,7 @@ class EHSArguments:
         if args.verbose:
             setDebugMode()
 
-        logger.debug(args)
+        logger.debug("%s", args)
 
         if args.dryrun:
             if args.dumpfile is None:
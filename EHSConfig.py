@@ -1,12 +1,80 @@
 from EHSExceptions import ConfigException
 from EHSArguments import EHSArguments
+from EHSSingleton import Singleton
+from collections import OrderedDict
+import copy
 import yaml
 import os
-import re
 
-from CustomLogger import logger
-
-class EHSConfig():
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+from CustomLogger import logger, LazyFormat
+
+_TIME_UNITS = {
+    's': 1,   # seconds
+    'm': 60,  # minutes
+    'h': 3600 # hours
+}
+
+# parsed YAML files keyed by absolute path, validated against (mtime, size) so a reload only re-parses changed files
+_YAML_CACHE = OrderedDict()
+_YAML_CACHE_MAX = 16
+
+# (config section, key, message) for keys that must be present if the section is configured
+_REQUIRED_KEYS = (
+    ('SERIAL', 'device', "serial device config parameter is missing"),
+    ('SERIAL', 'baudrate', "serial baudrate config parameter is missing"),
+    ('TCP', 'ip', "tcp ip config parameter is missing"),
+    ('TCP', 'port', "tcp port config parameter is missing"),
+    ('POLLING', 'fetch_interval', "fetch_interval in polling parameter is missing"),
+    ('POLLING', 'groups', "groups in polling parameter is missing"),
+    ('MQTT', 'broker-url', "mqtt broker-url config parameter is missing"),
+    ('MQTT', 'broker-port', "mqtt broker-port parameter is missing"),
+)
+
+_GENERAL_DEFAULTS = {
+    'protocolFile': None,
+    'allowControl': False,
+}
+
+_MQTT_DEFAULTS = {
+    'homeAssistantAutoDiscoverTopic': "",
+    'useCamelCaseTopicNames': False,
+    'topicPrefix': "ehsSentinel",
+    'client-id': "ehsSentinel",
+    'telemetryQos': 0,
+}
+
+_LOGGING_DEFAULTS = {
+    'messageNotFound': False,
+    'invalidPacket': False,
+    'deviceAdded': True,
+    'packetNotFromIndoorOutdoor': False,
+    'proccessedMessage': False,
+    'pollerMessage': False,
+    'controlMessage': False,
+}
+
+def _load_yaml_cached(path: str):
+    abspath = os.path.abspath(path)
+    stat = os.stat(abspath)
+    cached = _YAML_CACHE.get(abspath)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        _YAML_CACHE.move_to_end(abspath)
+    else:
+        with open(abspath, mode='rb') as file:
+            cached = (stat.st_mtime_ns, stat.st_size, yaml.load(file, Loader=YamlLoader))
+        _YAML_CACHE[abspath] = cached
+        if len(_YAML_CACHE) > _YAML_CACHE_MAX:
+            _YAML_CACHE.popitem(last=False)
+
+    # the config sections get modified during validation, never hand out the cached object itself
+    return copy.deepcopy(cached[2])
+
+class EHSConfig(metaclass=Singleton):
     """
     Singleton class to handle the configuration for the EHS Sentinel application.
     This class reads configuration parameters from a YAML file and validates them.
@@ -23,161 +91,100 @@ class EHSConfig():
     POLLING = None
     NASA_VAL_STORE = {}
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(EHSConfig, cls).__new__(cls, *args, **kwargs)
-            cls._instance._initialized = False
-        return cls._instance
-
-    def __init__(self, *args, **kwargs):
-        if self._initialized:
-            return
-        self._initialized = True
-        super().__init__(*args, **kwargs)
-
+    def __init__(self):
         logger.debug("init EHSConfig")
         self.args = EHSArguments()
 
-        with open(self.args.CONFIGFILE, mode='r') as file:
-            config = yaml.safe_load(file)
-            self.MQTT = config.get('mqtt')
-            self.GENERAL = config.get('general')
+        config = _load_yaml_cached(self.args.CONFIGFILE)
+        self.MQTT = config.get('mqtt')
+        self.GENERAL = config.get('general')
 
-            if 'tcp' in config:
-                self.TCP = config.get('tcp')
+        if 'tcp' in config:
+            self.TCP = config.get('tcp')
 
-            if 'serial' in config:
-                self.SERIAL = config.get('serial')
+        if 'serial' in config:
+            self.SERIAL = config.get('serial')
 
-            if 'logging' in config:
-                self.LOGGING = config.get('logging')
-            else:
-                self.LOGGING = {}
+        if 'logging' in config:
+            self.LOGGING = config.get('logging')
+        else:
+            self.LOGGING = {}
 
-            if 'polling' in config:
-                self.POLLING = config.get('polling')
+        if 'polling' in config:
+            self.POLLING = config.get('polling')
 
-            logger.debug(f"Configuration loaded: {config}")
-            
+        logger.debug("Configuration loaded: %s", LazyFormat(config))
 
         self.validate()
     
     def parse_time_string(self, time_str: str) -> int:
-        match = re.match(r'^(\d+)([smh])$', time_str.strip(), re.IGNORECASE)
-        if not match:
+        time_str = time_str.strip().lower()
+        value, unit = time_str[:-1], time_str[-1:]
+        if unit not in _TIME_UNITS or not value.isdigit():
             raise ValueError("Invalid time format. Use '10s', '10m', or '10h'.")
-        
-        value, unit = int(match.group(1)), match.group(2).lower()
-        
-        conversion_factors = {
-            's': 1,   # seconds
-            'm': 60,  # minutes
-            'h': 3600 # hours
-        }
     
-        return value * conversion_factors[unit]
+        return int(value) * _TIME_UNITS[unit]
 
     def validate(self):
-        if os.path.isfile(self.GENERAL['nasaRepositoryFile']):
-             with open(self.GENERAL['nasaRepositoryFile'], mode='r') as file:
-                self.NASA_REPO = yaml.safe_load(file)
-        else:
-            raise ConfigException(argument=self.GENERAL['nasaRepositoryFile'], message="NASA Respository File is missing")
-
-        if 'protocolFile' not in self.GENERAL:
-            self.GENERAL['protocolFile'] = None
-
-        if 'allowControl' not in self.GENERAL:
-            self.GENERAL['allowControl'] = False
-
-        if self.SERIAL is None and self.TCP is None:
+        nasa_repo_path = self.GENERAL['nasaRepositoryFile']
+        # every message is looked up in the repository, so an unreadable or broken file has to fail at startup
+        try:
+            self.NASA_REPO = _load_yaml_cached(nasa_repo_path)
+        except (FileNotFoundError, IsADirectoryError):
+            raise ConfigException(argument=nasa_repo_path, message="NASA Respository File is missing")
+        except OSError as e:
+            raise ConfigException(argument=nasa_repo_path, message=f"NASA Respository File couldn't be read ({e.strerror})")
+        except yaml.YAMLError as e:
+            raise ConfigException(argument=nasa_repo_path, message=f"NASA Respository File is not valid YAML ({e})")
+
+        self.GENERAL = {**_GENERAL_DEFAULTS, **self.GENERAL}
+
+        has_serial = self.SERIAL is not None
+        has_tcp = self.TCP is not None
+        if not has_serial and not has_tcp:
             raise ConfigException(argument="", message="define tcp or serial config parms")
 
-        if self.SERIAL is not None and self.TCP is not None:
+        if has_serial and has_tcp:
             raise ConfigException(argument="", message="you cannot define tcp and serial please define only one")
 
-        if self.SERIAL is not None:
-            if 'device' not in self.SERIAL:
-                raise ConfigException(argument=self.SERIAL['device'], message="serial device config parameter is missing")
-            
-            if 'baudrate' not in self.SERIAL:
-                raise ConfigException(argument=self.SERIAL['baudrate'], message="serial baudrate config parameter is missing")
-            
-        if self.TCP is not None:
-            if 'ip' not in self.TCP:
-                raise ConfigException(argument=self.TCP['ip'], message="tcp ip config parameter is missing")
+        for section, key, message in _REQUIRED_KEYS:
+            values = getattr(self, section)
+            if values is not None and key not in values:
+                raise ConfigException(argument=key, message=message)
+
+        polling = self.POLLING
+        if polling is not None:
+            groups = polling['groups']
+            for poller in polling['fetch_interval']:
+                name = poller['name']
+                if name not in groups:
+                    raise ConfigException(argument=name, message="Groupname from fetch_interval not defined in groups: ")
+                if 'schedule' in poller:
+                    try:
+                        poller['schedule'] = self.parse_time_string(poller['schedule'])
+                    except ValueError as e:
+                        raise ConfigException(argument=poller['schedule'], message="schedule value from fetch_interval couldn't be validated, use format 10s, 10m or 10h")
             
-            if 'port' not in self.TCP:
-                raise ConfigException(argument=self.TCP['port'], message="tcp port config parameter is missing")
-            
-        if self.POLLING is not None:
-            if 'fetch_interval' not in self.POLLING:
-                raise ConfigException(argument='', message="fetch_interval in polling parameter is missing")
-            
-            if 'groups' not in self.POLLING:
-                raise ConfigException(argument='', message="groups in polling parameter is missing")
-            
-            if 'fetch_interval' in self.POLLING and 'groups' in self.POLLING:
-                for poller in self.POLLING['fetch_interval']:
-                    if poller['name'] not in self.POLLING['groups']:
-                        raise ConfigException(argument=poller['name'], message="Groupname from fetch_interval not defined in groups: ")
-                    if 'schedule' in poller:
-                        try:
-                            poller['schedule'] = self.parse_time_string(poller['schedule'])
-                        except ValueError as e:
-                            raise ConfigException(argument=poller['schedule'], message="schedule value from fetch_interval couldn't be validated, use format 10s, 10m or 10h")
-                
-                for group in self.POLLING['groups']:
-                    for ele in self.POLLING['groups'][group]:
-                        if ele not in self.NASA_REPO:
-                            raise ConfigException(argument=ele, message="Element from group not in NASA Repository")
+            nasa_repo = self.NASA_REPO
+            for group, elements in groups.items():
+                missing = set(elements).difference(nasa_repo)
+                if missing:
+                    raise ConfigException(argument=", ".join(sorted(map(str, missing))), message=f"Element(s) from group {group} not in NASA Repository")
              
-        if 'broker-url' not in self.MQTT:
-            raise ConfigException(argument=self.MQTT['broker-url'], message="mqtt broker-url config parameter is missing")
+        mqtt = self.MQTT = {**_MQTT_DEFAULTS, **self.MQTT}
+        has_user = 'user' in mqtt
+        has_password = 'password' in mqtt
         
-        if 'broker-port' not in self.MQTT:
-            raise ConfigException(argument=self.MQTT['broker-port'], message="mqtt broker-port parameter is missing")
+        if not has_user and has_password:
+            raise ConfigException(argument='user', message="mqtt user parameter is missing")
         
-        if 'homeAssistantAutoDiscoverTopic' not in self.MQTT:
-           self.MQTT['homeAssistantAutoDiscoverTopic'] = ""
+        if not has_password and has_user:
+            raise ConfigException(argument='password', message="mqtt password parameter is missing")
 
-        if 'useCamelCaseTopicNames' not in self.MQTT:
-           self.MQTT['useCamelCaseTopicNames'] = False
-        
-        if 'topicPrefix' not in self.MQTT:
-            self.MQTT['topicPrefix'] = "ehsSentinel"
-
-        if 'client-id' not in self.MQTT:
-            self.MQTT['client-id'] = "ehsSentinel"
-        
-        if 'user' not in self.MQTT and 'password' in self.MQTT:
-            raise ConfigException(argument=self.SERIAL['device'], message="mqtt user parameter is missing")
-        
-        if 'password' not in self.MQTT and 'user' in self.MQTT:
-            raise ConfigException(argument=self.SERIAL['device'], message="mqtt password parameter is missing")
+        if mqtt['telemetryQos'] not in (0, 1, 2):
+            raise ConfigException(argument=mqtt['telemetryQos'], message="mqtt telemetryQos must be 0, 1 or 2")
         
-        if 'messageNotFound' not in self.LOGGING:
-            self.LOGGING['messageNotFound'] = False
-
-        if 'invalidPacket' not in self.LOGGING:
-            self.LOGGING['invalidPacket'] = False
-
-        if 'deviceAdded' not in self.LOGGING:
-            self.LOGGING['deviceAdded'] = True
-
-        if 'packetNotFromIndoorOutdoor' not in self.LOGGING:
-            self.LOGGING['packetNotFromIndoorOutdoor'] = False
-
-        if 'proccessedMessage' not in self.LOGGING:
-            self.LOGGING['proccessedMessage'] = False
-
-        if 'pollerMessage' not in self.LOGGING:
-            self.LOGGING['pollerMessage'] = False
-
-        if 'controlMessage' not in self.LOGGING:
-            self.LOGGING['controlMessage'] = False
+        self.LOGGING = {**_LOGGING_DEFAULTS, **(self.LOGGING or {})}
 
-        logger.info(f"Logging Config:")
-        for key, value in self.LOGGING.items():
-            logger.info(f"    {key}: {value}")
+        logger.info("Logging Config:\n%s", "\n".join(f"    {key}: {value}" for key, value in self.LOGGING.items()))
         
\ No newline at end of file
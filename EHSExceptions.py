@@ -1,22 +1,39 @@
 class EHSException(Exception):
-    """Base class for exceptions in this module."""
-    pass
+    """Base class for exceptions in this module.
 
-class MessageWarningException(EHSException):
-    """Exception raised by message errors.
+    The argument and message are stored in args, so no attribute dict
+    has to be filled on every raise.
 
     Attributes:
+        argument -- value which caused the error
         message -- explanation of the error
     """
 
+    __slots__ = ()
+
     def __init__(self, argument, message):
-        self.argument = argument
-        self.message = message
-        super().__init__(self.message)
+        super().__init__(argument, message)
+
+    @property
+    def argument(self):
+        return self.args[0]
+
+    @property
+    def message(self):
+        return self.args[1]
 
     def __str__(self):
         return f'{self.message}: {self.argument}'
 
+class MessageWarningException(EHSException):
+    """Exception raised by message errors.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    __slots__ = ()
+
 class ConfigException(EHSException):
     """Exception raised by multiple Config errors.
 
@@ -24,14 +41,11 @@ class ConfigException(EHSException):
         message -- explanation of the error
     """
 
+    __slots__ = ()
+
     def __init__(self, argument, message="Config Parameter Exception: "):
-        self.argument = argument
-        self.message = message
-        super().__init__(self.message)
+        super().__init__(argument, message)
 
-    def __str__(self):
-        return f'{self.message}: {self.argument}'
-    
 class ArgumentException(EHSException):
     """Exception raised by multiple Arguments errors.
 
@@ -39,14 +53,14 @@ class ArgumentException(EHSException):
         message -- explanation of the error
     """
 
+    __slots__ = ()
+
     def __init__(self, argument, message="Argument is missing"):
-        self.argument = argument
-        self.message = message
-        super().__init__(self.message)
+        super().__init__(argument, message)
 
     def __str__(self):
         return f'{self.argument} -> {self.message}'
-    
+
 class SkipInvalidPacketException(EHSException):
     """Exception raised for invalid message types.
 
@@ -55,9 +69,14 @@ class SkipInvalidPacketException(EHSException):
         message -- explanation of the error
     """
 
+    __slots__ = ()
+
     def __init__(self, message="Invalid message type provided"):
-        self.message = message
-        super().__init__(self.message)
+        super().__init__(None, message)
+
+    def __reduce__(self):
+        # rebuild with the single message parameter, not with the (argument, message) pair in args
+        return (self.__class__, (self.message,))
 
     def __str__(self):
-        return f'{self.message}'
\ No newline at end of file
+        return f'{self.message}'
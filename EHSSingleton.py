@@ -0,0 +1,11 @@
+class Singleton(type):
+    """
+    Metaclass which creates the instance on the first call and afterwards returns it directly,
+    without entering __init__ again.
+    The class using it has to define the class attribute _instance = None.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__call__(*args, **kwargs)
+        return cls._instance
@@ -1,43 +1,57 @@
 import asyncio
+import logging
 import os
 import signal
 import json
-import time
 
 import gmqtt
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode()
+
 # Get the logger
-from CustomLogger import logger
+from CustomLogger import logger, LazyFormat
 from EHSArguments import EHSArguments
 from EHSConfig import EHSConfig
+from EHSSingleton import Singleton
 from MessageProducer import MessageProducer
 
-class MQTTClient:
+# unnecessary prefixes of NASA names, removed for CamelCase topic names
+_NAME_PREFIXES = ('ENUM_', 'LVAR_', 'NASA_', 'VAR_')
+
+class MQTTClient(metaclass=Singleton):
     """
     MQTTClient is a singleton class that manages the connection and communication with an MQTT broker.
     It handles the initialization, connection, subscription, and message publishing for the MQTT client.
     The class also supports Home Assistant auto-discovery and maintains a list of known devices.
     """
+    __slots__ = (
+        'config', 'args', 'message_producer', 'broker', 'port', 'client_id', 'client',
+        'topicPrefix', 'homeAssistantAutoDiscoverTopic', 'useCamelCaseTopicNames', 'telemetryQos', 'hassDiscovery',
+        'known_topics', 'known_topics_set', 'known_devices_topic',
+        '_topic_prefix', '_known_devices_full_topic', '_known_devices_full_topic_b', '_hass_status_topic',
+        '_entity_topic_prefix', '_topic_handlers', '_subscriptions',
+        '_known_devices_flush_handle', '_known_devices_loaded', '_publish_count',
+        '_normalized_names', '_sensor_types', '_state_topics', '_discovery_messages', '_clear_hass_message',
+        '_device', '_origin',
+    )
+
     _instance = None
     STOP = asyncio.Event()
 
     DEVICE_ID = "samsung_ehssentinel"
-
-    def __new__(cls, *args, **kwargs):
-        
-        if not cls._instance:
-            cls._instance = super(MQTTClient, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    KNOWN_DEVICES_FLUSH_DELAY = 0.5 # seconds to collect newly added devices before the known devices topic is republished
+    KNOWN_DEVICES_LOAD_TIMEOUT = 1.0 # seconds to wait for the retained known devices topic before discovering without it
+    PUBLISH_YIELD_EVERY = 32 # publishes from async code after which control is given back to the event loop
 
     def __init__(self):
-        
-        if self._initialized:
-            return
         self.config = EHSConfig()
         self.args = EHSArguments()
         self.message_producer = None
-        self._initialized = True
         self.broker = self.config.MQTT['broker-url']
         self.port = self.config.MQTT['broker-port']
         self.client_id = self.config.MQTT['client-id']
@@ -51,144 +65,218 @@ class MQTTClient:
         self.topicPrefix = self.config.MQTT['topicPrefix']
         self.homeAssistantAutoDiscoverTopic = self.config.MQTT['homeAssistantAutoDiscoverTopic']
         self.useCamelCaseTopicNames = self.config.MQTT['useCamelCaseTopicNames']
+        self.telemetryQos = self.config.MQTT['telemetryQos']
+        self.hassDiscovery = len(self.homeAssistantAutoDiscoverTopic) > 0
 
-        self.initialized = True
-        self.known_topics: list = list()  # Set to keep track of known topics
+        self.known_topics: list = list()  # List of known topics in the order they were added, published to the known devices topic
+        self.known_topics_set: set = set()  # Same topics as set for fast membership tests
         self.known_devices_topic = "known/devices"  # Dedicated topic for storing known topics
 
+        # topics which are used on every message, built once
+        self._topic_prefix = self.topicPrefix.replace('/', '')
+        self._known_devices_full_topic = f"{self._topic_prefix}/{self.known_devices_topic}"
+        self._known_devices_full_topic_b = self._known_devices_full_topic.encode()
+        self._hass_status_topic = f"{self.homeAssistantAutoDiscoverTopic}/status"
+        self._entity_topic_prefix = f"{self._topic_prefix}/entity"
+        # handlers for the subscribed topics which are matched exactly, entity set topics are matched by prefix
+        self._topic_handlers = {
+            self._known_devices_full_topic: self._on_known_devices,
+            self._hass_status_topic: self._on_hass_status,
+        }
+        self._subscriptions = [
+                gmqtt.Subscription(self._known_devices_full_topic, 1),
+                gmqtt.Subscription(self._hass_status_topic, 1)
+            ]
+        if self.config.GENERAL['allowControl']:
+            self._subscriptions.append(gmqtt.Subscription(f"{self._entity_topic_prefix}/+/set", 1))
+        self._known_devices_flush_handle = None
+        self._known_devices_loaded = False
+        self._publish_count = 0
+
+        # per NASA name caches, the results only depend on the name and the static config
+        self._normalized_names: dict = {}
+        self._sensor_types: dict = {}
+        self._state_topics: dict = {}
+        self._discovery_messages: dict = {}
+        self._clear_hass_message = None
+
+        # static parts of every HASS discovery message
+        self._device = self._get_device()
+        self._origin = self._get_origin()
+
     async def connect(self):
         logger.info("[MQTT] Connecting to broker...")
         await self.client.connect(self.broker, self.port, keepalive=60, version=gmqtt.constants.MQTTv311)
 
         if self.args.CLEAN_KNOWN_DEVICES:
-            self._publish(f"{self.topicPrefix.replace('/', '')}/{self.known_devices_topic}", " ", retain=True)
+            self._clear_known_devices()
             logger.info("Known Devices Topic have been cleared")
 
     def subscribe_known_topics(self):        
         logger.info("Subscribe to known devices topic")
-        sublist =  [
-                gmqtt.Subscription(f"{self.topicPrefix.replace('/', '')}/{self.known_devices_topic}", 1),
-                gmqtt.Subscription(f"{self.homeAssistantAutoDiscoverTopic}/status", 1)
-            ]
-        if self.config.GENERAL['allowControl']:
-            sublist.append(gmqtt.Subscription(f"{self.topicPrefix.replace('/', '')}/entity/+/set", 1))
+        self.client.subscribe(self._subscriptions)
+        if not self._known_devices_loaded:
+            # if there is no retained known devices message, don't hold back the discovery forever
+            asyncio.get_running_loop().call_later(self.KNOWN_DEVICES_LOAD_TIMEOUT, self._set_known_devices_loaded)
 
-        self.client.subscribe(sublist)
+    def _set_known_devices_loaded(self):
+        self._known_devices_loaded = True
 
     def on_subscribe(self, client, mid, qos, properties):
         logger.debug('SUBSCRIBED')
 
     def on_message(self, client, topic, payload, qos, properties):        
-        if self.known_devices_topic in topic:
-            # Update the known devices set with the retained message
-            self.known_topics = list(filter(None, [x.strip() for x in payload.decode().split(",")]))
-            if properties['retain'] == True:
-                if self.config.LOGGING['deviceAdded']:
-                    logger.info(f"Loaded devices from known devices Topic:")
-
-                    for idx, devname in enumerate(self.known_topics, start=1):
-                        logger.info(f"Device no. {idx:<3}:  {devname} ")
-                else:
-                    logger.debug(f"Loaded devices from known devices Topic:")
-                    for idx, devname in enumerate(self.known_topics):
-                        logger.debug(f"Device added no. {idx:<3}:  {devname} ")
-
-        if f"{self.homeAssistantAutoDiscoverTopic}/status" == topic:
-            logger.info(f"HASS Status Messages {topic} received: {payload.decode()}")
-            if payload.decode() == "online":
-                self._publish(f"{self.topicPrefix.replace('/', '')}/{self.known_devices_topic}", " ", retain=True)
-                logger.info("Known Devices Topic have been cleared")          
-                self.clear_hass()
-                logger.info("All configuration from HASS has been resetet") 
-        
-        if topic.startswith(f"{self.topicPrefix.replace('/', '')}/entity"):
-            logger.info(f"HASS Set Entity Messages {topic} received: {payload.decode()}")
-            parts = topic.split("/")
-            if self.message_producer is None:
-                self.message_producer = MessageProducer(None)
-            asyncio.create_task(self.message_producer.write_request(parts[2], payload.decode(), read_request_after=True))
+        handler = self._topic_handlers.get(topic)
+        if handler is not None:
+            handler(topic, payload, properties)
+        elif topic.startswith(self._entity_topic_prefix):
+            self._on_entity_set(topic, payload, properties)
+
+    def _on_known_devices(self, topic, payload, properties):
+        # Update the known devices set with the retained message, split the raw bytes so empty entries are never decoded
+        self.known_topics = [token.decode() for token in (part.strip() for part in payload.split(b",")) if token]
+        self.known_topics_set = set(self.known_topics)
+        self._known_devices_loaded = True
+        if properties['retain'] == True:
+            level = logging.INFO if self.config.LOGGING['deviceAdded'] else logging.DEBUG
+            if logger.isEnabledFor(level):
+                logger.log(level, "Loaded devices from known devices Topic:")
+                for idx, devname in enumerate(self.known_topics, start=1):
+                    logger.log(level, "Device no. %-3d:  %s ", idx, devname)
+
+    def _on_hass_status(self, topic, payload, properties):
+        text = payload.decode()
+        logger.info(f"HASS Status Messages {topic} received: {text}")
+        if text == "online":
+            self._clear_known_devices()
+            logger.info("Known Devices Topic have been cleared")          
+            self.clear_hass()
+            logger.info("All configuration from HASS has been resetet") 
+
+    def _on_entity_set(self, topic, payload, properties):
+        text = payload.decode()
+        logger.info(f"HASS Set Entity Messages {topic} received: {text}")
+        # <prefix>/entity/<NASA_NAME>/set
+        name = topic.rpartition("/")[0].rpartition("/")[2]
+        if self.message_producer is None:
+            self.message_producer = MessageProducer(None)
+        asyncio.create_task(self.message_producer.write_request(name, text, read_request_after=True))
 
     def on_connect(self, client, flags, rc, properties):
         if rc == 0:
             logger.info(f"Connected to MQTT with result code {rc}")
-            if len(self.homeAssistantAutoDiscoverTopic) > 0:
+            if self.hassDiscovery:
                 self.subscribe_known_topics()
         else:
             logger.error(f"Failed to connect, return code {rc}")
 
     def on_disconnect(self, client, packet, exc=None):        
         logger.info(f"Disconnected with result code ")
+        # gmqtt schedules the reconnect itself (reconnect_retries / reconnect_delay), starting another one here would race it
         logger.warning("Unexpected disconnection. Reconnecting...")
-        while True:
-            try:
-                self.client.reconnect()
-                break
-            except Exception as e:
-                logger.error(f"Reconnection failed: {e}")
-                time.sleep(5)
 
     def _publish(self, topic, payload, qos=0, retain=False):        
-        logger.debug(f"MQTT Publish Topic: {topic} payload: {payload}")
-        self.client.publish(f"{topic}", payload, qos, retain)
-        #time.sleep(0.1)
+        # topic can be str or already encoded bytes, gmqtt only encodes str topics
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("MQTT Publish Topic: %s payload: %s", topic, payload)
+        self.client.publish(topic, payload, qos, retain)
+
+    async def _publish_async(self, topic, payload, qos=0, retain=False):
+        # gmqtt only queues the packet, yield regularly so the transport can drain during discovery bursts
+        self._publish(topic, payload, qos, retain)
+        self._publish_count += 1
+        if self._publish_count % self.PUBLISH_YIELD_EVERY == 0:
+            await asyncio.sleep(0)
 
     def refresh_known_devices(self, devname):
         self.known_topics.append(devname)
-        if self.config.LOGGING['deviceAdded']:
-            logger.info(f"Device added no. {len(self.known_topics):<3}:  {devname} ")
-        else:
-            logger.debug(f"Device added no. {len(self.known_topics):<3}:  {devname} ")
-        self._publish(f"{self.topicPrefix.replace('/', '')}/{self.known_devices_topic}", ",".join(self.known_topics), retain=True)
+        self.known_topics_set.add(devname)
+        logger.log(logging.INFO if self.config.LOGGING['deviceAdded'] else logging.DEBUG,
+                   "Device added no. %-3d:  %s ", len(self.known_topics), devname)
+
+        # many devices are discovered in a burst after startup, publish the complete list only once per burst
+        if self._known_devices_flush_handle is None:
+            self._known_devices_flush_handle = asyncio.get_running_loop().call_later(self.KNOWN_DEVICES_FLUSH_DELAY, self._flush_known_devices)
+
+    def _clear_known_devices(self):
+        # a pending flush would republish the old list after the clear, and the devices would never be discovered again
+        if self._known_devices_flush_handle is not None:
+            self._known_devices_flush_handle.cancel()
+            self._known_devices_flush_handle = None
+        self.known_topics = []
+        self.known_topics_set = set()
+        self._publish(self._known_devices_full_topic_b, " ", retain=True)
+
+    def _flush_known_devices(self):
+        self._known_devices_flush_handle = None
+        self._publish(self._known_devices_full_topic_b, ",".join(self.known_topics), retain=True)
     
     async def publish_message(self, name, value):        
-        newname = f"{self._normalize_name(name)}"
+        # wait with the discovery until the retained known devices are loaded, otherwise every device is announced twice
+        if self.hassDiscovery and self._known_devices_loaded and name not in self.known_topics_set:
+            # register the name before awaiting, so a concurrent publish of the same name can't discover it again
+            self.refresh_known_devices(name)
+            await self.auto_discover_hass(name)
+
+        topicname = self._state_topics.get(name)
+        if topicname is None:
+            topicname = self._state_topics[name] = self._get_state_topic(name).encode()
         
-        if len(self.homeAssistantAutoDiscoverTopic) > 0:
+        if type(value) is float:
+            value = round(value, 2)
 
-            if name not in self.known_topics:
-                self.auto_discover_hass(name)
-                self.refresh_known_devices(name)
+        await self._publish_async(topicname, value, qos=self.telemetryQos, retain=False)
 
-            if self.config.NASA_REPO[name]['hass_opts']['writable']:
-                sensor_type = self.config.NASA_REPO[name]['hass_opts']['platform']['type']
-            else:
-                sensor_type = self.config.NASA_REPO[name]['hass_opts']['default_platform']
-            topicname = f"{self.config.MQTT['homeAssistantAutoDiscoverTopic']}/{sensor_type}/{self.DEVICE_ID}_{newname.lower()}/state"
+    def _get_state_topic(self, name):
+        newname = self._normalize_name(name)
+        if self.hassDiscovery:
+            return f"{self.homeAssistantAutoDiscoverTopic}/{self._get_sensor_type(name)}/{self.DEVICE_ID}_{newname.lower()}/state"
         else:
-            topicname = f"{self.topicPrefix.replace('/', '')}/{newname}"
-        
-        if isinstance(value, (int, float)) and not isinstance(value, bool):
-            value = round(value, 2) if isinstance(value, float) and "." in f"{value}" else value
-
-        self._publish(topicname, value, qos=2, retain=False)
+            return f"{self._topic_prefix}/{newname}"
+
+    def _get_sensor_type(self, name):
+        sensor_type = self._sensor_types.get(name)
+        if sensor_type is None:
+            hass_opts = self.config.NASA_REPO[name]['hass_opts']
+            if hass_opts['writable']:
+                sensor_type = hass_opts['platform']['type']
+            else:
+                sensor_type = hass_opts['default_platform']
+            self._sensor_types[name] = sensor_type
+        return sensor_type
 
     def clear_hass(self):
-        entities = {}
-        for nasa in self.config.NASA_REPO:
-            namenorm = self._normalize_name(nasa)
-            if self.config.NASA_REPO[nasa]['hass_opts']['writable']:
-                sensor_type = self.config.NASA_REPO[nasa]['hass_opts']['platform']['type']
-            else:
-                sensor_type = self.config.NASA_REPO[nasa]['hass_opts']['default_platform']
-            entities[namenorm] = {"platform": sensor_type}
-        
+        # the NASA repository is static, so the clear message is only built on the first HASS restart
+        if self._clear_hass_message is None:
+            self._clear_hass_message = self._build_clear_hass_message()
+
+        topic, payload = self._clear_hass_message
+        self._publish(topic, payload, qos=1, retain=True)
+
+    def _build_clear_hass_message(self):
         device = {
-            "device": self._get_device(),
-            "origin": self._get_origin(),
-            "components": entities,
-            "qos": 2
+            "device": self._device,
+            "origin": self._origin,
+            "components": {self._normalize_name(nasa): {"platform": self._get_sensor_type(nasa)} for nasa in self.config.NASA_REPO},
+            "qos": 1
         }
 
-        logger.debug(f"Auto Discovery HomeAssistant Clear Message: ")
-        logger.debug(f"{device}")
+        logger.debug("Auto Discovery HomeAssistant Clear Message: \n%s", LazyFormat(device))
+
+        return (f"{self.homeAssistantAutoDiscoverTopic}/device/{self.DEVICE_ID}/config".encode(),
+                _json_dumps(device))
+
+    async def auto_discover_hass(self, name):
+        discovery = self._discovery_messages.get(name)
+        if discovery is None:
+            discovery = self._discovery_messages[name] = self._build_discovery_message(name)
 
-        self._publish(f"{self.config.MQTT['homeAssistantAutoDiscoverTopic']}/device/{self.DEVICE_ID}/config",
-                      json.dumps(device, ensure_ascii=False),
-                      qos=2, 
-                      retain=True)
+        topic, payload = discovery
+        await self._publish_async(topic, payload, qos=1, retain=True)
 
-    def auto_discover_hass(self, name):
-        entity = {}
+    def _build_discovery_message(self, name):
+        hass_opts = self.config.NASA_REPO[name]['hass_opts']
+        platform = hass_opts['platform']
         namenorm = self._normalize_name(name)
         entity = {
                 "name": f"{namenorm}",
@@ -199,51 +287,48 @@ class MQTTClient:
                 "value_template": "{{ value }}"
                 #"value_template": "{{ value if value | length > 0 else 'unavailable' }}",
             }
-        if self.config.NASA_REPO[name]['hass_opts']['writable'] and self.config.GENERAL['allowControl']:
-            sensor_type = self.config.NASA_REPO[name]['hass_opts']['platform']['type']
+        if hass_opts['writable'] and self.config.GENERAL['allowControl']:
+            sensor_type = platform['type']
             if sensor_type == 'select':
-                entity['options'] = self.config.NASA_REPO[name]['hass_opts']['platform']['options']
+                entity['options'] = platform['options']
             if sensor_type == 'number':
-                entity['mode'] = self.config.NASA_REPO[name]['hass_opts']['platform']['mode']
-                entity['min'] = self.config.NASA_REPO[name]['hass_opts']['platform']['min']
-                entity['max'] = self.config.NASA_REPO[name]['hass_opts']['platform']['max']
-                if 'step' in self.config.NASA_REPO[name]['hass_opts']['platform']:
-                    entity['step'] = self.config.NASA_REPO[name]['hass_opts']['platform']['step']
+                entity['mode'] = platform['mode']
+                entity['min'] = platform['min']
+                entity['max'] = platform['max']
+                if 'step' in platform:
+                    entity['step'] = platform['step']
                     
-            entity['command_topic'] = f"{self.topicPrefix.replace('/', '')}/entity/{name}/set"
+            entity['command_topic'] = f"{self._entity_topic_prefix}/{name}/set"
             entity['optimistic'] = False
         else:
-            sensor_type = self.config.NASA_REPO[name]['hass_opts']['default_platform']
+            sensor_type = hass_opts['default_platform']
 
-        if 'unit' in self.config.NASA_REPO[name]['hass_opts']:
-            entity['unit_of_measurement'] = self.config.NASA_REPO[name]['hass_opts']['unit']
+        if 'unit' in hass_opts:
+            entity['unit_of_measurement'] = hass_opts['unit']
 
         entity['platform'] = sensor_type
-        entity['state_topic'] = f"{self.config.MQTT['homeAssistantAutoDiscoverTopic']}/{sensor_type}/{self.DEVICE_ID}_{namenorm.lower()}/state"
+        entity['state_topic'] = f"{self.homeAssistantAutoDiscoverTopic}/{sensor_type}/{self.DEVICE_ID}_{namenorm.lower()}/state"
 
-        if 'payload_off' in self.config.NASA_REPO[name]['hass_opts']['platform']:
+        if 'payload_off' in platform:
             entity['payload_off'] = "OFF"
-        if 'payload_on' in self.config.NASA_REPO[name]['hass_opts']['platform']:
+        if 'payload_on' in platform:
             entity['payload_on'] = "ON"
-        if 'state_class' in self.config.NASA_REPO[name]['hass_opts']:
-            entity['state_class'] = self.config.NASA_REPO[name]['hass_opts']['state_class']
-        if 'device_class' in self.config.NASA_REPO[name]['hass_opts']:
-            entity['device_class'] = self.config.NASA_REPO[name]['hass_opts']['device_class']
+        if 'state_class' in hass_opts:
+            entity['state_class'] = hass_opts['state_class']
+        if 'device_class' in hass_opts:
+            entity['device_class'] = hass_opts['device_class']
 
         device = {
-            "device": self._get_device(),
-            "origin": self._get_origin(),
-            "qos": 2
+            "device": self._device,
+            "origin": self._origin,
+            "qos": 1
         }
         device.update(entity)
 
-        logger.debug(f"Auto Discovery HomeAssistant Message: ")
-        logger.debug(f"{device}")
+        logger.debug("Auto Discovery HomeAssistant Message: \n%s", LazyFormat(device))
 
-        self._publish(f"{self.config.MQTT['homeAssistantAutoDiscoverTopic']}/{sensor_type}/{self.DEVICE_ID}_{name.lower()}/config",
-                      json.dumps(device, ensure_ascii=False),
-                      qos=2, 
-                      retain=True)
+        return (f"{self.homeAssistantAutoDiscoverTopic}/{sensor_type}/{self.DEVICE_ID}_{name.lower()}/config".encode(),
+                _json_dumps(device))
 
     def _get_device(self):
         return {
@@ -261,20 +346,13 @@ class MQTTClient:
             }     
 
     def _normalize_name(self, name):
-        if self.useCamelCaseTopicNames:
-            prefix_to_remove = ['ENUM_', 'LVAR_', 'NASA_', 'VAR_']
-            # remove unnecessary prefixes of name
-            for prefix in prefix_to_remove:
-                if name.startswith(prefix):
-                    name = name[len(prefix):]
-                    break
-
-            name_parts = name.split("_")
-            tmpname = name_parts[0].lower()
-            # construct new name in CamelCase
-            for i in range(1, len(name_parts)):
-                tmpname += name_parts[i].capitalize()
-        else:
-            tmpname = name
+        if not self.useCamelCaseTopicNames:
+            return name
 
+        tmpname = self._normalized_names.get(name)
+        if tmpname is None:
+            # construct new name in CamelCase
+            # every prefix ends at the first underscore, so partition strips it
+            first, *rest = (name.partition('_')[2] if name.startswith(_NAME_PREFIXES) else name).split("_")
+            tmpname = self._normalized_names[name] = first.lower() + "".join(part.capitalize() for part in rest)
         return tmpname
@@ -6,12 +6,13 @@ from CustomLogger import logger
 from EHSArguments import EHSArguments
 from EHSConfig import EHSConfig
 from EHSExceptions import MessageWarningException
+from EHSSingleton import Singleton
 from MQTTClient import MQTTClient
 
 from NASAMessage import NASAMessage
 from NASAPacket import NASAPacket
 
-class MessageProcessor:
+class MessageProcessor(metaclass=Singleton):
     """
     The MessageProcessor class is responsible for handling and processing incoming messages for the EHS-Sentinel system.
     The class provides methods to process messages, extract submessages, search for message definitions in a configuration repository, 
@@ -19,8 +20,9 @@ class MessageProcessor:
     message processing steps.
     """
 
+    _instance = None
+
     def __init__(self):
-        self._initialized = True
         self.config = EHSConfig()
         self.args = EHSArguments()
         self.mqtt = MQTTClient()
@@ -40,14 +42,14 @@ class MessageProcessor:
                 if self.config.LOGGING['messageNotFound']:
                     logger.info(f"Message not Found in NASA repository: {hexmsg:<6} Type: {msg.packet_message_type} Payload: {msg.packet_payload} = {packedval}")
                 else:
-                    logger.debug(f"Message not Found in NASA repository: {hexmsg:<6} Type: {msg.packet_message_type} Payload: {msg.packet_payload} = {packedval}")
+                    logger.debug("Message not Found in NASA repository: %-6s Type: %s Payload: %s = %s", hexmsg, msg.packet_message_type, msg.packet_payload, packedval)
 
     async def protocolMessage(self, msg: NASAMessage, msgname, msgvalue):
 
         if self.config.LOGGING['proccessedMessage']:
             logger.info(f"Message number: {hex(msg.packet_message):<6} {msgname:<50} Type: {msg.packet_message_type} Payload: {msgvalue} ({msg.packet_payload})")
         else:
-            logger.debug(f"Message number: {hex(msg.packet_message):<6} {msgname:<50} Type: {msg.packet_message_type} Payload: {msgvalue}")
+            logger.debug("Message number: %-6s %-50s Type: %s Payload: %s", hex(msg.packet_message), msgname, msg.packet_message_type, msgvalue)
 
         if self.config.GENERAL['protocolFile'] is not None:
             with open(self.config.GENERAL['protocolFile'], "a") as protWriter:
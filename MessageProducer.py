@@ -2,12 +2,13 @@ from CustomLogger import logger
 from EHSArguments import EHSArguments
 from EHSConfig import EHSConfig
 from EHSExceptions import MessageWarningException
+from EHSSingleton import Singleton
 import asyncio
 
 from NASAMessage import NASAMessage
 from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
 
-class MessageProducer:
+class MessageProducer(metaclass=Singleton):
     """
     The MessageProducer class is responsible for sending messages to the EHS-Sentinel system.
     It follows the singleton pattern to ensure only one instance is created. The class provides methods to request and write
@@ -19,16 +20,7 @@ class MessageProducer:
     _CHUNKSIZE = 10 # message requests list will be split into this chunks, experience have shown that more then 10 are too much for an packet
     writer = None
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(MessageProducer, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-
     def __init__(self, writer: asyncio.StreamWriter):
-        if self._initialized:
-            return
-        self._initialized = True
         self.writer = writer
         self.config = EHSConfig()
 
@@ -43,7 +35,7 @@ class MessageProducer:
             if self.config.LOGGING['pollerMessage']:
                 logger.info(f"Polling following NASAPacket: {nasa_packet}")
             else:
-                logger.debug(f"Sent data NASAPacket: {nasa_packet}")
+                logger.debug("Sent data NASAPacket: %s", nasa_packet)
 
     async def write_request(self, message: str, value: str | int, read_request_after=False):
         nasa_packet = self._build_default_request_packet()
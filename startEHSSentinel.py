@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import serial
 import serial_asyncio
 import traceback
@@ -84,10 +85,10 @@ async def process_buffer(buffer, args, config):
                     if (len(buffer[i:]) > 14):
                         asyncio.create_task(process_packet(buffer[i:], args, config))
                     else:
-                        logger.debug(f"Buffermessages to short for NASA {len(buffer)}")
+                        logger.debug("Buffermessages to short for NASA %s", len(buffer))
                     break
         else:
-            logger.debug(f"Buffer to short for NASA {len(buffer)}")
+            logger.debug("Buffer to short for NASA %s", len(buffer))
 
 async def serial_connection(config, args):
     buffer = []
@@ -131,8 +132,9 @@ async def serial_read(reader: asyncio.StreamReader, args, config):
                 if packet_size <= len(data):
                     if current_byte == b'\x34':
                         asyncio.create_task(process_buffer(data, args, config))
-                        logger.debug(f"Received int: {data}")
-                        logger.debug(f"Received hex: {[hex(x) for x in data]}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Received int: %s", data)
+                            logger.debug("Received hex: %s", [hex(x) for x in data])
                         data = bytearray()
                         packet_started = False
                     else:
@@ -140,10 +142,10 @@ async def serial_read(reader: asyncio.StreamReader, args, config):
                             logger.warning(f"Packet does not end with an x34. Size {packet_size} length {len(data)}")
                             logger.warning(f"Received hex: {[hex(x) for x in data]}")
                             logger.warning(f"Received raw: {data}")
-                        else:
-                            logger.debug(f"Packet does not end with an x34. Size {packet_size} length {len(data)}")
-                            logger.debug(f"Received hex: {[hex(x) for x in data]}")
-                            logger.debug(f"Received raw: {data}")
+                        elif logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Packet does not end with an x34. Size %s length %s", packet_size, len(data))
+                            logger.debug("Received hex: %s", [hex(x) for x in data])
+                            logger.debug("Received raw: %s", data)
                         
                         data = bytearray()
                         packet_started = False
@@ -199,9 +201,10 @@ async def process_packet(buffer, args, config):
         try:
             nasa_packet = NASAPacket()
             nasa_packet.parse(buffer)
-            logger.debug("Packet processed: ")
-            logger.debug(f"Packet raw: {[hex(x) for x in buffer]}")
-            logger.debug(nasa_packet)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Packet processed: ")
+                logger.debug("Packet raw: %s", [hex(x) for x in buffer])
+                logger.debug(nasa_packet)
             if nasa_packet.packet_source_address_class in (AddressClassEnum.Outdoor, AddressClassEnum.Indoor):
                 messageProcessor = MessageProcessor()
                 await messageProcessor.process_message(nasa_packet)    
@@ -215,21 +218,22 @@ async def process_packet(buffer, args, config):
                     logger.info(nasa_packet)
                     logger.info(f"Packet int: {[x for x in buffer]}")
                     logger.info(f"Packet hex: {[hex(x) for x in buffer]}")
-                else:
+                elif logger.isEnabledFor(logging.DEBUG):
                     logger.debug("Message not From Indoor or Outdoor") 
                     logger.debug(nasa_packet)
-                    logger.debug(f"Packet int: {[x for x in buffer]}")
-                    logger.debug(f"Packet hex: {[hex(x) for x in buffer]}")
+                    logger.debug("Packet int: %s", [x for x in buffer])
+                    logger.debug("Packet hex: %s", [hex(x) for x in buffer])
         except ValueError as e:
             logger.warning("Value Error on parsing Packet, Packet will be skipped")
             logger.warning(f"Error processing message: {e}")
             logger.warning(f"Complete Packet: {[hex(x) for x in buffer]}")
             logger.warning(traceback.format_exc())
         except SkipInvalidPacketException as e:
-            logger.debug("Warnung accured, Packet will be skipped")
-            logger.debug(f"Error processing message: {e}")
-            logger.debug(f"Complete Packet: {[hex(x) for x in buffer]}")
-            logger.debug(traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Warnung accured, Packet will be skipped")
+                logger.debug("Error processing message: %s", e)
+                logger.debug("Complete Packet: %s", [hex(x) for x in buffer])
+                logger.debug(traceback.format_exc())
         except MessageWarningException as e:
             logger.warning("Warnung accured, Packet will be skipped")
             logger.warning(f"Error processing message: {e}")
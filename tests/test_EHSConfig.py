@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from EHSArguments import EHSArguments
+from EHSConfig import EHSConfig
+from EHSExceptions import ConfigException
+
+CONFIG = """
+general:
+  nasaRepositoryFile: {nasa_repo}
+tcp:
+  ip: 127.0.0.1
+  port: 4196
+mqtt:
+  broker-url: 127.0.0.1
+  broker-port: 1883
+polling:
+  fetch_interval:
+    - name: group1
+      enable: true
+      schedule: 30m
+  groups:
+    group1:
+      - 0x4201
+"""
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.yml"
+    path.write_text(CONFIG.format(nasa_repo=os.path.join(REPO_DIR, "data", "NasaRepository.yml")))
+    monkeypatch.setattr(sys, "argv", ["startEHSSentinel.py", "--configfile", str(path)])
+    # both are singletons, start every test with fresh instances
+    monkeypatch.setattr(EHSArguments, "_instance", None)
+    monkeypatch.setattr(EHSConfig, "_instance", None)
+    return path
+
+def test_non_string_group_element_raises_config_exception(config_file):
+    # an unquoted 0x4201 is loaded by YAML as the int 16897
+    with pytest.raises(ConfigException) as excinfo:
+        EHSConfig()
+
+    assert excinfo.value.argument == "16897"
+    assert "group1" in excinfo.value.message